@@ -5,30 +5,55 @@ from tqdm import tqdm
 import time
 from pinecone import Pinecone
 from config import OPENAI_API_KEY, PINECONE_API_KEY, PINECONE_INDEX_NAME
+from disease_records import iter_disease_records
+from embedding_config import (EMBEDDING, MIGRATION_EMBEDDING, MIGRATION_NAMESPACE_SUFFIX,
+                              check_migration_target, create_embedding)
+from verify_index import print_report, verify_index
 
 # Initialize OpenAI and Pinecone
 client = OpenAI(api_key=OPENAI_API_KEY)
 pc = Pinecone(api_key=PINECONE_API_KEY)
-index = pc.Index(PINECONE_INDEX_NAME)
+index = pc.Index(EMBEDDING.index_name or PINECONE_INDEX_NAME)
 
-def get_embedding(text, model="text-embedding-ada-002"):
+# During a migration every vector is also written with the migration model
+check_migration_target(PINECONE_INDEX_NAME)
+migration_index = None
+if MIGRATION_EMBEDDING:
+    migration_index = pc.Index(MIGRATION_EMBEDDING.index_name or PINECONE_INDEX_NAME)
+
+def get_embedding(text, config=EMBEDDING):
     try:
-        response = client.embeddings.create(
-            input=text,
-            model=model
-        )
-        return response.data[0].embedding
+        return create_embedding(client, text, config)
     except Exception as e:
         print(f"Error getting embedding: {e}")
         return None
 
+def write_migration_vector(disease_name, vector_id, text, metadata):
+    """Dual-write a vector with the migration model when one is configured"""
+    if not MIGRATION_EMBEDDING:
+        return
+    
+    embedding = get_embedding(text, MIGRATION_EMBEDDING)
+    if not embedding:
+        print(f"  Warning: Failed to get migration embedding for {vector_id}. Skipping...")
+        return
+    
+    migration_index.upsert(
+        vectors=[{
+            'id': vector_id,
+            'values': embedding,
+            'metadata': metadata
+        }],
+        namespace=MIGRATION_EMBEDDING.namespace(disease_name)
+    )
+
 def clean_existing_data():
-    """Remove all existing namespaces and their data"""
+    """Remove all existing namespaces and their data, keeping the migration model's namespaces"""
     print("\nCleaning existing data...")
     stats = index.describe_index_stats()
     
     for namespace in stats.namespaces:
-        if namespace:  # Skip empty namespace
+        if namespace and not namespace.endswith(MIGRATION_NAMESPACE_SUFFIX):  # Skip empty and migration namespaces
             print(f"Deleting namespace: {namespace}")
             index.delete(delete_all=True, namespace=namespace)
             time.sleep(0.5)  # Rate limiting
@@ -44,11 +69,13 @@ def create_embeddings():
         print("\nCreating embeddings...")
         
         for disease_name, data in tqdm(diseases_data.items()):
-            namespace = disease_name
+            namespace = EMBEDDING.namespace(disease_name)
             print(f"\nProcessing disease: {disease_name}")
             
+            records = iter_disease_records(disease_name, data)
+            
             # Always create at least one vector per disease
-            description = data.get('description', "No description available")
+            main_id, description, main_metadata = next(records)
             description_embedding = get_embedding(description)
             
             if not description_embedding:
@@ -58,66 +85,40 @@ def create_embeddings():
             # Create main disease vector (ensures namespace exists)
             index.upsert(
                 vectors=[{
-                    'id': f"{disease_name}_main",
+                    'id': main_id,
                     'values': description_embedding,
-                    'metadata': {
-                        'disease_name': disease_name,
-                        'type': 'disease_main',
-                        'description': description
-                    }
+                    'metadata': main_metadata
                 }],
                 namespace=namespace
             )
+            write_migration_vector(disease_name, main_id, description, main_metadata)
             time.sleep(0.1)  # Rate limiting
             
-            # Process categories if they exist
-            if 'categories' in data and data['categories']:
-                def process_category(category, path=[]):
-                    current_path = path + [category['name']]
-                    print(f"  Processing category: {' > '.join(current_path)}")
-                    
-                    # Create embedding for category content
-                    content = category.get('content', [])
-                    if isinstance(content, list):
-                        content = ' '.join(content)
-                    
-                    # Even if content is empty, we still want to create a vector for the category
-                    if not content:
-                        content = f"Category: {category['name']}"
-                    
-                    cat_embedding = get_embedding(content)
-                    if not cat_embedding:
-                        print(f"  Warning: Failed to get embedding for category {' > '.join(current_path)}. Skipping...")
-                        return
-                    
-                    # Create a unique ID for this category
-                    category_id = f"{disease_name}_{'_'.join(current_path)}"
-                    
-                    # Upsert the category vector
-                    index.upsert(
-                        vectors=[{
-                            'id': category_id,
-                            'values': cat_embedding,
-                            'metadata': {
-                                'disease_name': disease_name,
-                                'category_path': current_path,
-                                'type': 'category',
-                                'content': content,
-                                'category_name': category['name']
-                            }
-                        }],
-                        namespace=namespace
-                    )
-                    time.sleep(0.1)  # Rate limiting
-                    
-                    # Process subcategories recursively
-                    if 'subcategories' in category and category['subcategories']:
-                        for subcat in category['subcategories']:
-                            process_category(subcat, current_path)
+            # Process categories; a failed category also skips its subcategories
+            failed_paths = []
+            for category_id, content, metadata in records:
+                current_path = metadata['category_path']
+                if any(current_path[:len(path)] == path for path in failed_paths):
+                    continue
+                print(f"  Processing category: {' > '.join(current_path)}")
+                
+                cat_embedding = get_embedding(content)
+                if not cat_embedding:
+                    print(f"  Warning: Failed to get embedding for category {' > '.join(current_path)}. Skipping...")
+                    failed_paths.append(current_path)
+                    continue
                 
-                # Start processing root categories
-                for category in data['categories']:
-                    process_category(category)
+                # Upsert the category vector
+                index.upsert(
+                    vectors=[{
+                        'id': category_id,
+                        'values': cat_embedding,
+                        'metadata': metadata
+                    }],
+                    namespace=namespace
+                )
+                write_migration_vector(disease_name, category_id, content, metadata)
+                time.sleep(0.1)  # Rate limiting
             
             # Verify the vectors for this disease
             time.sleep(0.5)  # Give Pinecone time to index
@@ -160,41 +161,16 @@ if __name__ == "__main__":
         
         # Verify the results
         verify_new_embeddings()
+        print_report(verify_index(index))
+        if migration_index:
+            # Failed migration writes only print warnings, so check that side too
+            print("\nVerifying migration embeddings...")
+            print_report(verify_index(migration_index, config=MIGRATION_EMBEDDING))
         
         print("\nProcess completed successfully!")
     else:
         print("Operation cancelled.")
 
-# Verify the embeddings
-def verify_embeddings():
-    stats = index.describe_index_stats()
-    print("\nVerification of stored embeddings:")
-    print("=" * 50)
-    print(f"Total namespaces: {len(stats.namespaces)}")
-    
-    for namespace, data in stats.namespaces.items():
-        if namespace not in ['', 'medicines']:
-            print(f"\nNamespace: {namespace}")
-            print(f"Vectors: {data['vector_count']}")
-            
-            # Get all vectors in this namespace
-            results = index.query(
-                vector=[0] * 1536,
-                top_k=data['vector_count'],
-                namespace=namespace,
-                include_metadata=True
-            )
-            
-            print("Contents:")
-            for match in results['matches']:
-                if 'category_path' in match['metadata']:
-                    path = " > ".join(match['metadata']['category_path'])
-                    print(f"- {path}")
-                else:
-                    print(f"- Main disease description")
-
-verify_embeddings()
-
 # Check the diseases namespaces
 def check_disease_namespaces():
     stats = index.describe_index_stats()
@@ -207,45 +183,3 @@ def check_disease_namespaces():
 
 # Check the results
 check_disease_namespaces()
-
-# Add this function after the existing check_disease_namespaces()
-def detailed_namespace_check():
-    stats = index.describe_index_stats()
-    namespaces = stats.namespaces
-    
-    print("\nDetailed Namespace Analysis:")
-    print("=" * 50)
-    print(f"Total number of namespaces: {len(namespaces)}")
-    print("=" * 50)
-    
-    # Compare with diseases in JSON
-    with open("diseases.json", "r") as f:
-        diseases_data = json.load(f)
-    
-    print(f"Number of diseases in JSON file: {len(diseases_data)}")
-    print("\nDisease names in JSON:")
-    json_diseases = set(diseases_data.keys())
-    for d in sorted(json_diseases):
-        print(f"- {d}")
-    
-    print("\nNamespaces in Pinecone:")
-    pinecone_namespaces = set(namespaces.keys())
-    for n in sorted(pinecone_namespaces):
-        print(f"- {n}")
-    
-    print("\nExtra namespaces (in Pinecone but not in JSON):")
-    extra = pinecone_namespaces - json_diseases
-    for e in sorted(extra):
-        print(f"- {e}")
-    
-    # Sort namespaces by vector count
-    sorted_namespaces = sorted(namespaces.items(), key=lambda x: x[1]['vector_count'], reverse=True)
-    
-    print("\nDetailed namespace counts:")
-    for namespace, data in sorted_namespaces:
-        print(f"\nNamespace: {namespace}")
-        print(f"Vectors in namespace: {data['vector_count']}")
-        print("-" * 30)
-
-# Run the detailed check
-detailed_namespace_check() 
\ No newline at end of file
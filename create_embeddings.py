@@ -4,6 +4,9 @@ from tqdm import tqdm
 import time
 from pinecone import Pinecone
 from config import OPENAI_API_KEY, PINECONE_API_KEY, PINECONE_INDEX_NAME
+from embedding_config import EMBEDDING, create_embedding
+from index_utils import iter_vector_batches
+from query_log import recorded, stage
 
 # Initialize OpenAI
 client = OpenAI(api_key=OPENAI_API_KEY)
@@ -12,41 +15,42 @@ client = OpenAI(api_key=OPENAI_API_KEY)
 pc = Pinecone(api_key=PINECONE_API_KEY)
 
 # Connect to the index
-index = pc.Index(PINECONE_INDEX_NAME)
+index = pc.Index(EMBEDDING.index_name or PINECONE_INDEX_NAME)
 
-def get_query_embedding(query_text):
-    response = client.embeddings.create(
-        input=query_text,
-        model="text-embedding-ada-002"
-    )
-    return response.data[0].embedding
+def get_query_embedding(query_text, config=EMBEDDING):
+    with stage("embedding", model=config.model, dimension=config.dimension):
+        return create_embedding(client, query_text, config)
 
+@recorded("search_medical_recommendations")
 def search_medical_recommendations(query_text):
     query_embedding = get_query_embedding(query_text)
     
     # Search in diseases namespace
-    disease_results = index.query(
-        vector=query_embedding,
-        top_k=1,
-        namespace='diseases',
-        include_metadata=True
-    )
+    with stage("query", namespace='diseases', top_k=1):
+        disease_results = index.query(
+            vector=query_embedding,
+            top_k=1,
+            namespace='diseases',
+            include_metadata=True
+        )
     
     if disease_results['matches']:
         disease_info = disease_results['matches'][0]['metadata']['text']
         print(f"\nIdentified Disease Context:\n{disease_info}")
         
         # Search for relevant medicines
-        medicine_results = index.query(
-            vector=query_embedding,
-            top_k=10,
-            namespace='medicines',
-            include_metadata=True,
-            hybrid_config={
-                "alpha": 0.5,
-                "query": query_text
-            }
-        )
+        hybrid_config = {
+            "alpha": 0.5,
+            "query": query_text
+        }
+        with stage("query", namespace='medicines', top_k=10, hybrid_config=hybrid_config):
+            medicine_results = index.query(
+                vector=query_embedding,
+                top_k=10,
+                namespace='medicines',
+                include_metadata=True,
+                hybrid_config=hybrid_config
+            )
         
         print("\nRecommended Medications:")
         print("-" * 50)
@@ -65,19 +69,14 @@ def check_namespaces():
     print(f"\nDiseases Namespace:")
     print(f"Total vectors: {total_diseases}")
     
-    # Get all disease entries
-    disease_samples = index.query(
-        vector=[0] * 1536,  # dummy vector
-        top_k=total_diseases,  # Get all diseases
-        namespace='diseases',
-        include_metadata=True
-    )
+    # Page through all disease entries in bounded batches
     print("\nAll Disease Entries:")
     print("-" * 50)
-    for match in disease_samples['matches']:
-        print(f"ID: {match['id']}")
-        print(f"Text: {match['metadata']['text']}")
-        print("-" * 50)
+    for batch in iter_vector_batches(index, 'diseases'):
+        for vector_id, _, metadata, _ in batch:
+            print(f"ID: {vector_id}")
+            print(f"Text: {metadata.get('text', '')}")
+            print("-" * 50)
 
     # Check medicines namespace count only
     medicine_stats = index.describe_index_stats(namespace='medicines')
@@ -0,0 +1,34 @@
+def iter_disease_records(disease_name, data):
+    """Yield (vector_id, text, metadata) for a disease and all of its categories"""
+    # Always create at least one vector per disease
+    description = data.get('description', "No description available")
+    yield f"{disease_name}_main", description, {
+        'disease_name': disease_name,
+        'type': 'disease_main',
+        'description': description
+    }
+
+    def walk(category, path):
+        current_path = path + [category['name']]
+
+        content = category.get('content', [])
+        if isinstance(content, list):
+            content = ' '.join(content)
+
+        # Even if content is empty, we still want to create a vector for the category
+        if not content:
+            content = f"Category: {category['name']}"
+
+        yield f"{disease_name}_{'_'.join(current_path)}", content, {
+            'disease_name': disease_name,
+            'category_path': current_path,
+            'type': 'category',
+            'content': content,
+            'category_name': category['name']
+        }
+
+        for subcat in category.get('subcategories') or []:
+            yield from walk(subcat, current_path)
+
+    for category in data.get('categories') or []:
+        yield from walk(category, [])
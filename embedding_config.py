@@ -0,0 +1,99 @@
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+# Output dimension of each model when no reduced dimension is requested
+NATIVE_DIMENSIONS = {
+    "text-embedding-ada-002": 1536,
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+}
+
+# Disease namespaces written by a migration model end with this suffix
+MIGRATION_NAMESPACE_SUFFIX = "__migration"
+
+# Namespaces used by search_medical_recommendations, not by the disease tree
+NON_DISEASE_NAMESPACES = {'diseases', 'medicines'}
+
+@dataclass(frozen=True)
+class EmbeddingConfig:
+    """Embedding model, vector dimension and where its vectors are stored"""
+    model: str
+    dimension: int
+    index_name: Optional[str] = None   # None means the default PINECONE_INDEX_NAME
+    namespace_suffix: str = ""         # appended to disease namespaces
+
+    def __post_init__(self):
+        native = NATIVE_DIMENSIONS.get(self.model)
+        if self.dimension <= 0:
+            raise ValueError(f"Invalid embedding dimension: {self.dimension}")
+        if native is None:
+            return
+        if not self.supports_dimensions and self.dimension != native:
+            raise ValueError(f"{self.model} only produces {native}-d vectors, not {self.dimension}")
+        if self.dimension > native:
+            raise ValueError(f"{self.model} produces at most {native}-d vectors, not {self.dimension}")
+
+    @property
+    def supports_dimensions(self):
+        # Only the text-embedding-3 models accept a reduced output dimension
+        return self.model.startswith("text-embedding-3")
+
+    def namespace(self, name):
+        return f"{name}{self.namespace_suffix}"
+
+    def zero_vector(self):
+        """Dummy vector for metadata-filtered queries"""
+        return [0.0] * self.dimension
+
+def create_embedding(client, text, config):
+    """Embed text (a string or list of strings) with the given config"""
+    kwargs = {'input': text, 'model': config.model}
+    if config.supports_dimensions:
+        kwargs['dimensions'] = config.dimension
+    response = client.embeddings.create(**kwargs)
+    if isinstance(text, list):
+        return [item.embedding for item in response.data]
+    return response.data[0].embedding
+
+# Model used by all embedding and query paths
+EMBEDDING = EmbeddingConfig(
+    model=os.environ.get("EMBEDDING_MODEL", "text-embedding-ada-002"),
+    dimension=int(os.environ.get("EMBEDDING_DIMENSION", 1536)),
+    index_name=os.environ.get("EMBEDDING_INDEX_NAME") or None
+)
+
+# Target of a dual-write migration; None when no migration is configured
+MIGRATION_EMBEDDING = None
+if os.environ.get("MIGRATION_EMBEDDING_MODEL"):
+    MIGRATION_EMBEDDING = EmbeddingConfig(
+        model=os.environ["MIGRATION_EMBEDDING_MODEL"],
+        dimension=int(os.environ["MIGRATION_EMBEDDING_DIMENSION"]),
+        index_name=os.environ.get("MIGRATION_INDEX_NAME") or None,
+        namespace_suffix=MIGRATION_NAMESPACE_SUFFIX
+    )
+
+def check_migration_target(default_index_name):
+    """Reject a migration that would write a different dimension into the current index
+
+    Index names are resolved against default_index_name (PINECONE_INDEX_NAME),
+    since either config may leave index_name unset.
+    """
+    if MIGRATION_EMBEDDING is None or MIGRATION_EMBEDDING.dimension == EMBEDDING.dimension:
+        return
+    # A Pinecone index has a single dimension
+    if (MIGRATION_EMBEDDING.index_name or default_index_name) == (EMBEDDING.index_name or default_index_name):
+        raise ValueError("A migration to a different dimension needs its own index; set MIGRATION_INDEX_NAME")
+
+def disease_names(namespaces, config=EMBEDDING):
+    """Disease names stored under config's namespaces, ignoring the other model's namespaces"""
+    names = []
+    for namespace in namespaces:
+        if not namespace or namespace in NON_DISEASE_NAMESPACES:
+            continue
+        if config.namespace_suffix:
+            if namespace.endswith(config.namespace_suffix):
+                names.append(namespace[:-len(config.namespace_suffix)])
+        elif not namespace.endswith(MIGRATION_NAMESPACE_SUFFIX):
+            names.append(namespace)
+    return names
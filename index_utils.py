@@ -0,0 +1,34 @@
+FETCH_BATCH_SIZE = 100  # ids per fetch request, keeps responses small
+
+def iter_id_pages(index, namespace, page_size=FETCH_BATCH_SIZE):
+    """Yield pages of vector ids in a namespace using the paginated list endpoint"""
+    for ids in index.list(namespace=namespace, limit=page_size):
+        if ids:
+            yield list(ids)
+
+def iter_vector_batches(index, namespace, page_size=FETCH_BATCH_SIZE):
+    """Yield batches of fetched vectors (id, values, metadata, sparse_values), one page at a time"""
+    for ids in iter_id_pages(index, namespace, page_size):
+        response = index.fetch(ids=ids, namespace=namespace)
+        batch = []
+        # Keep the page order; ids deleted between list and fetch are skipped
+        for vector_id in ids:
+            vector = response.vectors.get(vector_id)
+            if vector is None:
+                continue
+            sparse = getattr(vector, 'sparse_values', None)
+            if sparse is not None:
+                sparse = {'indices': list(sparse.indices), 'values': list(sparse.values)}
+            batch.append((vector_id, vector.values, dict(vector.metadata or {}), sparse))
+        if batch:
+            yield batch
+
+def list_namespaces(index, skip_empty=True):
+    """Return {namespace: vector_count} from the index stats"""
+    stats = index.describe_index_stats()
+    namespaces = {}
+    for namespace, data in stats.namespaces.items():
+        if skip_empty and not namespace:
+            continue
+        namespaces[namespace] = data['vector_count']
+    return namespaces
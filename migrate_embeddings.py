@@ -0,0 +1,210 @@
+"""Embedding model migration: backfill, compare, promote
+
+Switch-over flow:
+
+1. Set MIGRATION_EMBEDDING_MODEL / MIGRATION_EMBEDDING_DIMENSION (and
+   MIGRATION_INDEX_NAME when the dimension changes). From then on
+   create_disease_embeddings.py writes every vector with both models; the
+   new model's vectors go to '<disease>__migration' namespaces.
+2. 'backfill' embeds the existing corpus with the new model only.
+3. 'compare <queries>' checks the migration namespaces are complete and
+   reports the top-k overlap of both models over the query set.
+4. 'promote' copies the '<disease>__migration' vectors into the plain
+   '<disease>' namespaces of the migration index (no embedding calls) and
+   deletes the suffixed namespaces. When the migration shares the current
+   index, the live namespaces hold a mix of both models until step 5.
+5. Set EMBEDDING_MODEL / EMBEDDING_DIMENSION / EMBEDDING_INDEX_NAME to the
+   migration values and unset the MIGRATION_* variables.
+"""
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from openai import OpenAI
+from pinecone import Pinecone
+from tqdm import tqdm
+from config import OPENAI_API_KEY, PINECONE_API_KEY, PINECONE_INDEX_NAME
+from disease_records import iter_disease_records
+from embedding_config import (EMBEDDING, MIGRATION_EMBEDDING, EmbeddingConfig,
+                              check_migration_target, create_embedding, disease_names)
+from index_utils import iter_vector_batches, list_namespaces
+from verify_index import print_report, verify_index
+
+EMBED_BATCH_SIZE = 100     # texts per embedding request
+UPSERT_BATCH_SIZE = 100    # vectors per upsert request
+QUERY_WORKERS = 8          # namespaces queried concurrently during comparison
+
+# Initialize OpenAI and Pinecone
+client = OpenAI(api_key=OPENAI_API_KEY)
+pc = Pinecone(api_key=PINECONE_API_KEY)
+check_migration_target(PINECONE_INDEX_NAME)
+
+def get_index(config):
+    return pc.Index(config.index_name or PINECONE_INDEX_NAME)
+
+def write_disease(index, config, disease_name, records):
+    """Embed a disease's records with config and upsert them into its namespace"""
+    vectors = []
+    for i in range(0, len(records), EMBED_BATCH_SIZE):
+        batch = records[i:i + EMBED_BATCH_SIZE]
+        embeddings = create_embedding(client, [text for _, text, _ in batch], config)
+        for (vector_id, _, metadata), values in zip(batch, embeddings):
+            vectors.append({'id': vector_id, 'values': values, 'metadata': metadata})
+
+    for i in range(0, len(vectors), UPSERT_BATCH_SIZE):
+        index.upsert(vectors=vectors[i:i + UPSERT_BATCH_SIZE], namespace=config.namespace(disease_name))
+        time.sleep(0.1)  # Rate limiting
+
+def backfill(new=MIGRATION_EMBEDDING):
+    """One-time backfill of every disease with the migration model only
+
+    New writes after this go to both models through create_embeddings().
+    """
+    with open("diseases.json", "r") as f:
+        diseases_data = json.load(f)
+
+    new_index = get_index(new)
+    print(f"\nBackfilling {len(diseases_data)} diseases with {new.model} ({new.dimension}d) "
+          f"-> namespace '<disease>{new.namespace_suffix}'")
+
+    for disease_name, data in tqdm(diseases_data.items()):
+        records = list(iter_disease_records(disease_name, data))
+        try:
+            write_disease(new_index, new, disease_name, records)
+        except Exception as e:
+            print(f"Warning: Failed to backfill {disease_name}: {e}")
+
+    print("\nBackfill completed!")
+    return verify_migration(new)
+
+def verify_migration(new=MIGRATION_EMBEDDING):
+    """Check that every disease has complete, current vectors in the migration namespaces"""
+    print("\nVerifying migration embeddings...")
+    return print_report(verify_index(get_index(new), config=new))
+
+def promote(new=MIGRATION_EMBEDDING):
+    """Copy the migration namespaces to the plain disease namespaces of the migration index"""
+    if not verify_migration(new):
+        print("\nError: migration namespaces are incomplete; run 'backfill' before promoting")
+        return
+
+    new_index = get_index(new)
+    target = EmbeddingConfig(new.model, new.dimension, new.index_name)
+    diseases = disease_names(list_namespaces(new_index).keys(), new)
+
+    print(f"\nPromoting {len(diseases)} namespaces in '{new.index_name or PINECONE_INDEX_NAME}'...")
+    for disease_name in tqdm(diseases):
+        source = new.namespace(disease_name)
+        for batch in iter_vector_batches(new_index, source):
+            vectors = []
+            for vector_id, values, metadata, sparse in batch:
+                vector = {'id': vector_id, 'values': values, 'metadata': metadata}
+                if sparse is not None:
+                    vector['sparse_values'] = sparse
+                vectors.append(vector)
+            new_index.upsert(vectors=vectors, namespace=target.namespace(disease_name))
+        new_index.delete(delete_all=True, namespace=source)
+        time.sleep(0.1)  # Rate limiting
+
+    print("\nPromotion completed! Now point the EMBEDDING_* settings at the migration model:")
+    print(f"EMBEDDING_MODEL={new.model}")
+    print(f"EMBEDDING_DIMENSION={new.dimension}")
+    if new.index_name:
+        print(f"EMBEDDING_INDEX_NAME={new.index_name}")
+    print("and unset the MIGRATION_* settings.")
+
+def search(index, config, query_text, diseases, top_k):
+    """Top-k vector ids for a query across the given disease namespaces"""
+    vector = create_embedding(client, query_text, config)
+
+    def query_namespace(disease_name):
+        return index.query(
+            vector=vector,
+            top_k=top_k,
+            namespace=config.namespace(disease_name)
+        )['matches']
+
+    with ThreadPoolExecutor(max_workers=QUERY_WORKERS) as executor:
+        matches = [m for result in executor.map(query_namespace, diseases) for m in result]
+
+    matches.sort(key=lambda m: m['score'], reverse=True)
+    return [m['id'] for m in matches[:top_k]]
+
+def load_queries(path):
+    """Read the query set: one query per line, optionally 'disease<TAB>query'"""
+    queries = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if '\t' in line:
+                disease_name, query_text = line.split('\t', 1)
+                queries.append((query_text, [disease_name]))
+            else:
+                queries.append((line, None))
+    return queries
+
+def compare_recall(queries_path, top_k=10, threshold=0.8, old=EMBEDDING, new=MIGRATION_EMBEDDING):
+    """Compare top-k overlap of the current and migration namespaces over a query set"""
+    # Overlap over a half-populated migration side would be meaningless
+    if not verify_migration(new):
+        print("\nError: migration namespaces are incomplete; no cut-over verdict")
+        return None
+
+    with open("diseases.json", "r") as f:
+        all_diseases = list(json.load(f).keys())
+
+    old_index, new_index = get_index(old), get_index(new)
+    queries = load_queries(queries_path)
+    overlaps = []
+
+    print(f"\nComparing recall@{top_k} over {len(queries)} queries...")
+    for query_text, diseases in tqdm(queries):
+        diseases = diseases or all_diseases
+        old_ids = search(old_index, old, query_text, diseases, top_k)
+        new_ids = search(new_index, new, query_text, diseases, top_k)
+        overlap = len(set(old_ids) & set(new_ids)) / max(len(old_ids), 1)
+        overlaps.append((overlap, query_text))
+
+    if not overlaps:
+        print("No queries found")
+        return None
+
+    mean_overlap = sum(o for o, _ in overlaps) / len(overlaps)
+    print("\nRecall Overlap:")
+    print("-" * 50)
+    print(f"Mean overlap@{top_k}: {mean_overlap:.3f}")
+    print(f"Min overlap@{top_k}: {min(o for o, _ in overlaps):.3f}")
+
+    low = sorted(o for o in overlaps if o[0] < threshold)
+    if low:
+        print(f"\nQueries below {threshold:.2f}:")
+        for overlap, query_text in low:
+            print(f"- {overlap:.2f}  {query_text}")
+
+    if mean_overlap >= threshold:
+        print(f"\nMigration model meets the {threshold:.2f} overlap threshold; safe to cut over.")
+    else:
+        print(f"\nMigration model is below the {threshold:.2f} overlap threshold; do not cut over yet.")
+    return mean_overlap
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill, compare and promote embeddings for a model migration")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("backfill")
+    subparsers.add_parser("promote")
+    compare_parser = subparsers.add_parser("compare")
+    compare_parser.add_argument("queries", help="Query set file")
+    compare_parser.add_argument("--top-k", type=int, default=10)
+    compare_parser.add_argument("--threshold", type=float, default=0.8)
+    args = parser.parse_args()
+
+    if MIGRATION_EMBEDDING is None:
+        print("Error: set MIGRATION_EMBEDDING_MODEL and MIGRATION_EMBEDDING_DIMENSION first")
+    elif args.command == "backfill":
+        backfill()
+    elif args.command == "promote":
+        promote()
+    else:
+        compare_recall(args.queries, args.top_k, args.threshold)
@@ -2,42 +2,43 @@ import json
 from openai import OpenAI
 from pinecone import Pinecone
 from config import OPENAI_API_KEY, PINECONE_API_KEY, PINECONE_INDEX_NAME
+from embedding_config import EMBEDDING, create_embedding, disease_names
+from query_log import recorded, stage
 
 # Initialize OpenAI
 client = OpenAI(api_key=OPENAI_API_KEY)
 
 # Initialize Pinecone
 pc = Pinecone(api_key=PINECONE_API_KEY)
-index = pc.Index(PINECONE_INDEX_NAME)
+index = pc.Index(EMBEDDING.index_name or PINECONE_INDEX_NAME)
 
-def get_embedding(text, model="text-embedding-ada-002"):
+def get_embedding(text, config=EMBEDDING):
     """Get embedding for the query text"""
     try:
-        response = client.embeddings.create(
-            input=text,
-            model=model
-        )
-        return response.data[0].embedding
+        with stage("embedding", model=config.model, dimension=config.dimension):
+            return create_embedding(client, text, config)
     except Exception as e:
         print(f"Error getting embedding: {e}")
         return None
 
 def list_available_diseases():
     """List all available diseases from Pinecone namespaces"""
-    stats = index.describe_index_stats()
+    with stage("describe_index_stats"):
+        stats = index.describe_index_stats()
     namespaces = stats.namespaces
     
     print("\nAvailable diseases:")
     print("-" * 50)
     
     # Filter out empty namespace and non-disease namespaces
-    disease_namespaces = [ns for ns in namespaces.keys() if ns and ns != 'medicines']
+    disease_namespaces = disease_names(namespaces.keys())
     
     for i, disease in enumerate(sorted(disease_namespaces), 1):
         print(f"{i}. {disease}")
     
     return sorted(disease_namespaces)
 
+@recorded("query_disease", interactive=True)
 def query_disease(disease_query):
     # Get all available diseases
     available_diseases = list_available_diseases()
@@ -55,18 +56,20 @@ def query_disease(disease_query):
     
     print(f"\nIdentified Disease: {disease_name}")
     print("-" * 50)
+    namespace = EMBEDDING.namespace(disease_name)
     
     # Create a dummy vector for filtering (required by Pinecone)
-    dummy_vector = [0.0] * 1536  # Assuming 1536 dimensions for text-embedding-ada-002
+    dummy_vector = EMBEDDING.zero_vector()
     
     # Query the main disease vector
-    main_results = index.query(
-        vector=dummy_vector,  # Add this dummy vector
-        namespace=disease_name,
-        filter={"type": "disease_main"},
-        top_k=1,
-        include_metadata=True
-    )
+    with stage("query", namespace=namespace, filter={"type": "disease_main"}, top_k=1):
+        main_results = index.query(
+            vector=dummy_vector,  # Add this dummy vector
+            namespace=namespace,
+            filter={"type": "disease_main"},
+            top_k=1,
+            include_metadata=True
+        )
     
     if main_results['matches']:
         print("\nDescription:")
@@ -76,13 +79,14 @@ def query_disease(disease_query):
         print(description)
     
     # Get all category vectors for this disease
-    category_results = index.query(
-        vector=dummy_vector,  # Add this dummy vector
-        namespace=disease_name,
-        filter={"type": "category"},
-        top_k=100,  # Adjust based on expected number of categories
-        include_metadata=True
-    )
+    with stage("query", namespace=namespace, filter={"type": "category"}, top_k=100):
+        category_results = index.query(
+            vector=dummy_vector,  # Add this dummy vector
+            namespace=namespace,
+            filter={"type": "category"},
+            top_k=100,  # Adjust based on expected number of categories
+            include_metadata=True
+        )
     
     # Build category structure from results
     category_paths = {}
@@ -111,10 +115,11 @@ def query_disease(disease_query):
                 vector_id = category_paths[full_path]
                 
                 # Query for this specific category
-                content_result = index.fetch(
-                    ids=[vector_id],
-                    namespace=disease_name
-                )
+                with stage("fetch", namespace=namespace, ids=[vector_id]):
+                    content_result = index.fetch(
+                        ids=[vector_id],
+                        namespace=namespace
+                    )
                 
                 # Check if the vector exists in the response
                 # Updated to handle the new response format
@@ -163,6 +168,7 @@ def query_disease(disease_query):
         else:
             print("Invalid selection. Please try again.")
 
+@recorded("semantic_search")
 def semantic_search(query_text):
     """Search across all diseases using semantic search"""
     print(f"\nPerforming semantic search for: '{query_text}'")
@@ -175,11 +181,12 @@ def semantic_search(query_text):
         return
     
     # Search across all namespaces
-    results = index.query(
-        vector=query_embedding,
-        top_k=5,
-        include_metadata=True
-    )
+    with stage("query", top_k=5):
+        results = index.query(
+            vector=query_embedding,
+            top_k=5,
+            include_metadata=True
+        )
     
     if not results['matches']:
         print("No matching results found")
@@ -0,0 +1,111 @@
+import inspect
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from logging.handlers import RotatingFileHandler
+
+# Recording is off unless QUERY_LOG_PATH is set
+QUERY_LOG_PATH = os.environ.get("QUERY_LOG_PATH")
+QUERY_LOG_MAX_BYTES = int(os.environ.get("QUERY_LOG_MAX_BYTES", 10 * 1024 * 1024))
+QUERY_LOG_BACKUPS = int(os.environ.get("QUERY_LOG_BACKUPS", 5))
+
+_current_record = ContextVar("query_log_record", default=None)
+_logger = None
+
+def get_logger():
+    """Return the rotating query logger, or None when recording is disabled"""
+    global _logger
+    if _logger is None and QUERY_LOG_PATH:
+        _logger = logging.getLogger("query_log")
+        _logger.setLevel(logging.INFO)
+        _logger.propagate = False
+        handler = RotatingFileHandler(
+            QUERY_LOG_PATH,
+            maxBytes=QUERY_LOG_MAX_BYTES,
+            backupCount=QUERY_LOG_BACKUPS,
+            encoding="utf-8"
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        _logger.addHandler(handler)
+    return _logger
+
+def recorded(kind, interactive=False):
+    """Decorator recording a query call (first argument is the query text) and its stages
+
+    For interactive calls the total latency is the sum of the stages, so time
+    spent waiting on user input is not counted.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        query_param = next(iter(signature.parameters))
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            logger = get_logger()
+            if logger is None:
+                return func(*args, **kwargs)
+
+            try:
+                query = signature.bind(*args, **kwargs).arguments[query_param]
+            except TypeError:
+                # Let the call itself raise the usual argument error
+                return func(*args, **kwargs)
+
+            record = {
+                'kind': kind,
+                'query': query,
+                'started_at': time.time(),
+                'stages': [],
+                'error': None
+            }
+            token = _current_record.set(record)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                record['error'] = repr(e)
+                raise
+            finally:
+                if interactive:
+                    record['latency_ms'] = sum(s['latency_ms'] for s in record['stages'])
+                else:
+                    record['latency_ms'] = (time.perf_counter() - start) * 1000
+                _current_record.reset(token)
+                logger.info(json.dumps(record, ensure_ascii=False))
+        return wrapper
+    return decorator
+
+@contextmanager
+def stage(name, **params):
+    """Time one backend call inside a recorded query; a no-op when not recording"""
+    record = _current_record.get()
+    if record is None:
+        yield
+        return
+
+    entry = {'name': name, 'params': params}
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        entry['error'] = repr(e)
+        raise
+    finally:
+        entry['latency_ms'] = (time.perf_counter() - start) * 1000
+        record['stages'].append(entry)
+
+def read_records(path):
+    """Yield recorded queries from a log file and its rotated backups, oldest first"""
+    paths = [f"{path}.{i}" for i in range(QUERY_LOG_BACKUPS, 0, -1)] + [path]
+    for log_path in paths:
+        if not os.path.exists(log_path):
+            continue
+        with open(log_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
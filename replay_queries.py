@@ -0,0 +1,185 @@
+import argparse
+import asyncio
+import itertools
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from embedding_config import EMBEDDING, EmbeddingConfig, create_embedding
+from query_log import QUERY_LOG_PATH, read_records
+
+class LiveBackend:
+    """Replays recorded stages against the real OpenAI and Pinecone services"""
+
+    def __init__(self):
+        from openai import OpenAI
+        from pinecone import Pinecone
+        from config import OPENAI_API_KEY, PINECONE_API_KEY, PINECONE_INDEX_NAME
+
+        self.client = OpenAI(api_key=OPENAI_API_KEY)
+        self.index = Pinecone(api_key=PINECONE_API_KEY).Index(EMBEDDING.index_name or PINECONE_INDEX_NAME)
+
+    def run_stage(self, query, stage, state):
+        name, params = stage['name'], stage.get('params', {})
+        if name == 'embedding':
+            config = EmbeddingConfig(params['model'], params.get('dimension', EMBEDDING.dimension))
+            state['vector'] = create_embedding(self.client, query, config)
+        elif name == 'describe_index_stats':
+            self.index.describe_index_stats()
+        elif name == 'query':
+            # Optional arguments are only sent when the original call sent them
+            extra = {key: params[key] for key in ('filter', 'hybrid_config') if key in params}
+            self.index.query(
+                vector=state.get('vector') or EMBEDDING.zero_vector(),
+                namespace=params.get('namespace', ''),
+                top_k=params['top_k'],
+                include_metadata=True,
+                **extra
+            )
+        elif name == 'fetch':
+            self.index.fetch(ids=params['ids'], namespace=params.get('namespace', ''))
+
+class StandInBackend:
+    """Sleeps for each stage's recorded latency instead of calling the services"""
+
+    def __init__(self, latency_scale=1.0):
+        self.latency_scale = latency_scale
+
+    def run_stage(self, query, stage, state):
+        time.sleep(stage['latency_ms'] / 1000 * self.latency_scale)
+        if stage.get('error'):
+            raise RuntimeError(stage['error'])
+
+def replay_record(backend, record):
+    """Run every recorded backend stage of one query in order"""
+    state = {}
+    for stage in record['stages']:
+        backend.run_stage(record['query'], stage, state)
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+async def run_step(backend, records, qps, duration, workers):
+    """Drive records at a fixed arrival rate (open loop) and collect latencies"""
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=workers)
+    queue = asyncio.Queue()
+    latencies = []
+    completed_at = []
+    errors = 0
+    busy = peak_busy = peak_queue = 0
+
+    async def worker():
+        nonlocal errors, busy, peak_busy
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            scheduled_at, record = item
+            busy += 1
+            peak_busy = max(peak_busy, busy)
+            try:
+                await loop.run_in_executor(executor, replay_record, backend, record)
+            except Exception:
+                errors += 1
+            else:
+                # Measured from the scheduled send time so queueing delay counts
+                latencies.append((time.perf_counter() - scheduled_at) * 1000)
+            finally:
+                busy -= 1
+                completed_at.append(time.perf_counter())
+
+    tasks = [asyncio.create_task(worker()) for _ in range(workers)]
+    total = int(qps * duration)
+    source = itertools.cycle(records)
+    start = time.perf_counter()
+
+    # Arrivals follow the schedule regardless of how many requests are in flight
+    for i in range(total):
+        scheduled_at = start + i / qps
+        delay = scheduled_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        queue.put_nowait((scheduled_at, next(source)))
+        peak_queue = max(peak_queue, queue.qsize())
+
+    for _ in tasks:
+        queue.put_nowait(None)
+    await asyncio.gather(*tasks)
+    executor.shutdown()
+
+    # Rate between the first and last completion, so the drain tail after
+    # the last arrival does not count against throughput
+    span = completed_at[-1] - completed_at[0] if len(completed_at) > 1 else 0.0
+    throughput = (len(completed_at) - 1) / span if span else 0.0
+
+    latencies.sort()
+    return {
+        'target_qps': qps,
+        'sent': total,
+        'completed': len(latencies),
+        'errors': errors,
+        'error_rate': errors / total if total else 0.0,
+        'throughput': throughput,
+        'peak_busy': peak_busy,
+        'peak_queue': peak_queue,
+        # Every worker busy means the replay pool, not the backend, set the limit
+        'client_bound': peak_busy >= workers,
+        'p50': percentile(latencies, 50),
+        'p90': percentile(latencies, 90),
+        'p99': percentile(latencies, 99),
+        'max': latencies[-1] if latencies else 0.0
+    }
+
+def print_report(results):
+    print("\nReplay Results:")
+    print("-" * 104)
+    print(f"{'QPS':>8} {'Sent':>7} {'Done':>7} {'Err%':>6} {'Thru/s':>8} "
+          f"{'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9} {'Busy':>5} {'Queue':>6}")
+    for r in results:
+        if r['client_bound']:
+            note = "  <- client-bound (raise --workers)"
+        # Falling behind the arrival rate or erroring marks saturation
+        elif r['throughput'] < 0.95 * r['target_qps'] or r['error_rate'] > 0.01:
+            note = "  <- saturated"
+        else:
+            note = ""
+        print(f"{r['target_qps']:>8.1f} {r['sent']:>7} {r['completed']:>7} "
+              f"{r['error_rate'] * 100:>6.1f} {r['throughput']:>8.1f} "
+              f"{r['p50']:>9.1f} {r['p90']:>9.1f} {r['p99']:>9.1f} {r['max']:>9.1f} "
+              f"{r['peak_busy']:>5} {r['peak_queue']:>6}{note}")
+    print("-" * 104)
+
+def replay(log_path, qps_steps, duration, workers, backend, kinds=None):
+    records = [r for r in read_records(log_path) if not kinds or r['kind'] in kinds]
+    if not records:
+        print(f"No recorded queries found in {log_path}")
+        return []
+
+    print(f"\nReplaying {len(records)} recorded queries from {log_path}")
+    results = []
+    for qps in qps_steps:
+        print(f"Running {qps} QPS for {duration}s...")
+        results.append(asyncio.run(run_step(backend, records, qps, duration, workers)))
+    print_report(results)
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Open-loop load replay of recorded queries")
+    parser.add_argument("--log", default=QUERY_LOG_PATH, required=QUERY_LOG_PATH is None,
+                        help="Query log path (defaults to QUERY_LOG_PATH)")
+    parser.add_argument("--qps", type=float, nargs="+", default=[1, 2, 5, 10, 20])
+    parser.add_argument("--duration", type=float, default=30, help="Seconds per QPS step")
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--kind", nargs="*",
+                        choices=["query_disease", "semantic_search", "search_medical_recommendations"])
+    parser.add_argument("--stand-in", action="store_true",
+                        help="Sleep for recorded stage latencies instead of calling the services")
+    parser.add_argument("--latency-scale", type=float, default=1.0)
+    args = parser.parse_args()
+
+    backend = StandInBackend(args.latency_scale) if args.stand_in else LiveBackend()
+    replay(args.log, args.qps, args.duration, args.workers, backend, args.kind)
@@ -0,0 +1,251 @@
+import argparse
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from pinecone import Pinecone
+from config import PINECONE_API_KEY, PINECONE_INDEX_NAME
+from embedding_config import EMBEDDING
+from index_utils import iter_vector_batches, list_namespaces
+
+CHUNK_SIZE = 1000          # vectors per .npy chunk, bounds memory during export
+UPSERT_BATCH_SIZE = 100    # vectors per upsert request
+UPSERT_THREADS = 16        # threads issuing async upserts
+MAX_IN_FLIGHT = 32         # upsert requests outstanding before restore waits
+EXPORT_WORKERS = 4         # namespaces exported concurrently
+MANIFEST_FILE = "manifest.json"
+DEFAULT_NAMESPACE_DIR = "ns_default"   # directory for the '' namespace
+FAILURES_FILE = "restore_failures.json"
+MAX_RETRIES = 5            # retries per failed upsert batch
+RETRY_BACKOFF = 1.0        # seconds before the first retry, doubled each time
+
+# Initialize Pinecone (pool_threads enables async_req upserts)
+INDEX_NAME = EMBEDDING.index_name or PINECONE_INDEX_NAME
+pc = Pinecone(api_key=PINECONE_API_KEY)
+index = pc.Index(INDEX_NAME, pool_threads=UPSERT_THREADS)
+
+def to_columns(metadata_rows):
+    """Convert a list of metadata dicts into {column: [values]} with None for missing keys"""
+    keys = []
+    for row in metadata_rows:
+        for key in row:
+            if key not in keys:
+                keys.append(key)
+    return {key: [row.get(key) for row in metadata_rows] for key in keys}
+
+def from_columns(columns, count):
+    """Convert columnar metadata back into a list of dicts, dropping missing values"""
+    rows = [{} for _ in range(count)]
+    for key, values in columns.items():
+        for row, value in zip(rows, values):
+            if value is not None:
+                row[key] = value
+    return rows
+
+def write_chunk(namespace_dir, chunk_num, ids, values, metadata_rows, sparse_rows):
+    """Write one chunk: float32 .npy matrix, ids, columnar metadata and any sparse values"""
+    name = f"chunk_{chunk_num:05d}"
+    np.save(os.path.join(namespace_dir, f"{name}.npy"), np.asarray(values, dtype=np.float32))
+    with open(os.path.join(namespace_dir, f"{name}.ids.json"), "w", encoding="utf-8") as f:
+        json.dump(ids, f, ensure_ascii=False)
+    with open(os.path.join(namespace_dir, f"{name}.metadata.json"), "w", encoding="utf-8") as f:
+        json.dump(to_columns(metadata_rows), f, ensure_ascii=False)
+    # Only hybrid namespaces carry sparse values
+    if any(sparse is not None for sparse in sparse_rows):
+        with open(os.path.join(namespace_dir, f"{name}.sparse.json"), "w", encoding="utf-8") as f:
+            json.dump(sparse_rows, f)
+    return name
+
+def export_namespace(namespace, namespace_dir):
+    """Stream every vector of a namespace into chunk files"""
+    os.makedirs(namespace_dir, exist_ok=True)
+    chunks = []
+    count = 0
+    ids, values, metadata_rows, sparse_rows = [], [], [], []
+
+    for batch in iter_vector_batches(index, namespace):
+        for vector_id, vector_values, metadata, sparse in batch:
+            ids.append(vector_id)
+            values.append(vector_values)
+            metadata_rows.append(metadata)
+            sparse_rows.append(sparse)
+
+        if len(ids) >= CHUNK_SIZE:
+            chunks.append(write_chunk(namespace_dir, len(chunks), ids, values, metadata_rows, sparse_rows))
+            count += len(ids)
+            ids, values, metadata_rows, sparse_rows = [], [], [], []
+
+    if ids:
+        chunks.append(write_chunk(namespace_dir, len(chunks), ids, values, metadata_rows, sparse_rows))
+        count += len(ids)
+
+    return {'vector_count': count, 'chunks': chunks}
+
+def export_snapshot(output_dir):
+    """Export all namespaces of the index into a local snapshot directory"""
+    print(f"\nExporting index '{INDEX_NAME}' to {output_dir}...")
+    start = time.time()
+    os.makedirs(output_dir, exist_ok=True)
+
+    stats = index.describe_index_stats()
+    namespaces = list_namespaces(index, skip_empty=False)
+
+    # Namespace names are disease names, so use numbered directories on disk
+    dirs = {
+        namespace: f"ns_{i:04d}" if namespace else DEFAULT_NAMESPACE_DIR
+        for i, namespace in enumerate(sorted(namespaces))
+    }
+
+    manifest = {
+        'index_name': INDEX_NAME,
+        'dimension': stats.dimension,
+        'created_at': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'namespaces': {}
+    }
+
+    with ThreadPoolExecutor(max_workers=EXPORT_WORKERS) as executor:
+        futures = {
+            namespace: executor.submit(export_namespace, namespace, os.path.join(output_dir, dirname))
+            for namespace, dirname in dirs.items()
+        }
+        for namespace, future in futures.items():
+            result = future.result()
+            result['dir'] = dirs[namespace]
+            manifest['namespaces'][namespace] = result
+            print(f"Exported: {namespace or '(default)'} ({result['vector_count']} vectors)")
+            if result['vector_count'] != namespaces[namespace]:
+                print(f"Warning: stats reported {namespaces[namespace]} vectors for {namespace}")
+
+    # Written last so a partial export is never mistaken for a complete snapshot
+    with open(os.path.join(output_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+    total = sum(ns['vector_count'] for ns in manifest['namespaces'].values())
+    print(f"\nExport completed: {total} vectors in {len(namespaces)} namespaces "
+          f"({time.time() - start:.1f}s)")
+
+def iter_chunk_vectors(namespace_dir, chunk):
+    """Yield upsert-ready vector dicts from one chunk"""
+    matrix = np.load(os.path.join(namespace_dir, f"{chunk}.npy"))
+    with open(os.path.join(namespace_dir, f"{chunk}.ids.json"), "r", encoding="utf-8") as f:
+        ids = json.load(f)
+    with open(os.path.join(namespace_dir, f"{chunk}.metadata.json"), "r", encoding="utf-8") as f:
+        metadata_rows = from_columns(json.load(f), len(ids))
+    sparse_rows = [None] * len(ids)
+    sparse_path = os.path.join(namespace_dir, f"{chunk}.sparse.json")
+    if os.path.exists(sparse_path):
+        with open(sparse_path, "r", encoding="utf-8") as f:
+            sparse_rows = json.load(f)
+
+    for vector_id, values, metadata, sparse in zip(ids, matrix, metadata_rows, sparse_rows):
+        vector = {'id': vector_id, 'values': values.tolist(), 'metadata': metadata}
+        if sparse is not None:
+            vector['sparse_values'] = sparse
+        yield vector
+
+def iter_upsert_batches(input_dir, manifest, only=None):
+    """Yield (namespace, chunk, batch) across all namespaces, loading one chunk at a time"""
+    for namespace, info in manifest['namespaces'].items():
+        namespace_dir = os.path.join(input_dir, info['dir'])
+        for chunk in info['chunks']:
+            if only is not None and (namespace, chunk) not in only:
+                continue
+            vectors = list(iter_chunk_vectors(namespace_dir, chunk))
+            for i in range(0, len(vectors), UPSERT_BATCH_SIZE):
+                yield namespace, chunk, vectors[i:i + UPSERT_BATCH_SIZE]
+
+def wait_for_upsert(request, namespace, batch):
+    """Wait for an async upsert, retrying the batch with backoff if it failed"""
+    try:
+        return request.get().upserted_count
+    except Exception as e:
+        error = e
+
+    for attempt in range(1, MAX_RETRIES + 1):
+        delay = RETRY_BACKOFF * 2 ** (attempt - 1)
+        print(f"Warning: upsert into {namespace or '(default)'} failed ({error}); "
+              f"retry {attempt}/{MAX_RETRIES} in {delay:.0f}s")
+        time.sleep(delay)
+        try:
+            return index.upsert(vectors=batch, namespace=namespace).upserted_count
+        except Exception as e:
+            error = e
+    raise error
+
+def restore_snapshot(input_dir, retry_failed=False):
+    """Upsert a local snapshot back into the index without any embedding calls
+
+    Chunks whose upserts still fail after retries are written to
+    restore_failures.json; retry_failed restores only those chunks.
+    """
+    with open(os.path.join(input_dir, MANIFEST_FILE), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    failures_path = os.path.join(input_dir, FAILURES_FILE)
+    only = None
+    if retry_failed:
+        with open(failures_path, "r", encoding="utf-8") as f:
+            only = {(item['namespace'], item['chunk']) for item in json.load(f)}
+
+    stats = index.describe_index_stats()
+    if stats.dimension != manifest['dimension']:
+        print(f"Error: snapshot dimension {manifest['dimension']} does not match "
+              f"index dimension {stats.dimension}")
+        return
+
+    print(f"\nRestoring snapshot of '{manifest['index_name']}' into '{INDEX_NAME}'...")
+    start = time.time()
+    total = 0
+    failed = {}
+
+    def finish(entry):
+        nonlocal total
+        namespace, chunk, batch, request = entry
+        try:
+            total += wait_for_upsert(request, namespace, batch)
+        except Exception as e:
+            failed.setdefault((namespace, chunk), repr(e))
+
+    # Batches from every namespace share one bounded window of in-flight upserts
+    in_flight = deque()
+    for namespace, chunk, batch in iter_upsert_batches(input_dir, manifest, only):
+        if len(in_flight) >= MAX_IN_FLIGHT:
+            finish(in_flight.popleft())
+        in_flight.append((namespace, chunk, batch,
+                          index.upsert(vectors=batch, namespace=namespace, async_req=True)))
+    while in_flight:
+        finish(in_flight.popleft())
+
+    print(f"\nRestored {total} vectors ({time.time() - start:.1f}s)")
+
+    if failed:
+        with open(failures_path, "w", encoding="utf-8") as f:
+            json.dump([{'namespace': namespace, 'chunk': chunk, 'error': error}
+                       for (namespace, chunk), error in failed.items()], f, indent=2, ensure_ascii=False)
+        print(f"\nError: {len(failed)} chunks failed after {MAX_RETRIES} retries:")
+        for (namespace, chunk), error in failed.items():
+            print(f"- {namespace or '(default)'} / {chunk}: {error}")
+        print(f"Failures written to {failures_path}; re-run with 'restore --retry-failed'")
+    else:
+        if os.path.exists(failures_path):
+            os.remove(failures_path)
+        print("Restore completed!")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export or restore a Pinecone index snapshot")
+    parser.add_argument("command", choices=["export", "restore"])
+    parser.add_argument("path", help="Snapshot directory")
+    parser.add_argument("--retry-failed", action="store_true",
+                        help="Restore only the chunks listed in restore_failures.json")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        export_snapshot(args.path)
+    else:
+        response = input("This will overwrite vectors with the same ids in the index. Proceed? (y/n): ")
+        if response.lower() == 'y':
+            restore_snapshot(args.path, args.retry_failed)
+        else:
+            print("Operation cancelled.")
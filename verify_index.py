@@ -0,0 +1,108 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from disease_records import iter_disease_records
+from embedding_config import EMBEDDING, disease_names
+from index_utils import iter_id_pages, iter_vector_batches, list_namespaces
+
+VERIFY_WORKERS = 8    # namespaces verified concurrently
+MAX_EXAMPLES = 10     # ids listed per problem type in the report
+
+def expected_vectors(disease_name, data):
+    """{vector_id: metadata} that the disease tree should produce"""
+    return {vector_id: metadata for vector_id, _, metadata in iter_disease_records(disease_name, data)}
+
+def verify_namespace(index, namespace, expected, config=EMBEDDING):
+    """Page through a namespace and diff it against the expected vectors"""
+    remaining = dict(expected)
+    result = {'namespace': namespace, 'checked': 0, 'extra': 0, 'stale': 0,
+              'extra_ids': [], 'stale_ids': []}
+
+    for batch in iter_vector_batches(index, namespace):
+        for vector_id, values, metadata, _ in batch:
+            result['checked'] += 1
+            expected_metadata = remaining.pop(vector_id, None)
+            if expected_metadata is None:
+                result['extra'] += 1
+                if len(result['extra_ids']) < MAX_EXAMPLES:
+                    result['extra_ids'].append(vector_id)
+            elif metadata != expected_metadata or len(values) != config.dimension:
+                result['stale'] += 1
+                if len(result['stale_ids']) < MAX_EXAMPLES:
+                    result['stale_ids'].append(vector_id)
+
+    result['missing'] = len(remaining)
+    result['missing_ids'] = sorted(remaining)[:MAX_EXAMPLES]
+    return result
+
+def count_namespace(index, namespace):
+    """Count ids in a namespace without fetching them"""
+    return sum(len(ids) for ids in iter_id_pages(index, namespace))
+
+def verify_index(index, diseases_path="diseases.json", config=EMBEDDING):
+    """Diff every disease namespace in the index against the source disease tree"""
+    with open(diseases_path, "r") as f:
+        diseases_data = json.load(f)
+
+    namespaces = list_namespaces(index)
+    indexed = set(disease_names(namespaces.keys(), config))
+    extra_namespaces = sorted(indexed - set(diseases_data))
+
+    def verify(disease_name):
+        return verify_namespace(
+            index,
+            config.namespace(disease_name),
+            expected_vectors(disease_name, diseases_data[disease_name]),
+            config
+        )
+
+    with ThreadPoolExecutor(max_workers=VERIFY_WORKERS) as executor:
+        results = list(executor.map(verify, sorted(diseases_data)))
+        extra_counts = dict(zip(
+            extra_namespaces,
+            executor.map(lambda name: count_namespace(index, config.namespace(name)), extra_namespaces)
+        ))
+
+    return {
+        'results': results,
+        'extra_namespaces': extra_counts
+    }
+
+def print_report(report):
+    results = report['results']
+    print("\nIndex Verification:")
+    print("=" * 50)
+    print(f"Diseases in source: {len(results)}")
+    print(f"Vectors checked: {sum(r['checked'] for r in results)}")
+    print(f"Missing vectors: {sum(r['missing'] for r in results)}")
+    print(f"Extra vectors: {sum(r['extra'] for r in results)}")
+    print(f"Stale vectors: {sum(r['stale'] for r in results)}")
+
+    for r in results:
+        if not (r['missing'] or r['extra'] or r['stale']):
+            continue
+        print(f"\nNamespace: {r['namespace']}")
+        print("-" * 30)
+        for kind in ('missing', 'extra', 'stale'):
+            if r[kind]:
+                print(f"{kind.capitalize()}: {r[kind]}")
+                for vector_id in r[f"{kind}_ids"]:
+                    print(f"- {vector_id}")
+
+    if report['extra_namespaces']:
+        print("\nExtra namespaces (in Pinecone but not in JSON):")
+        for namespace, count in report['extra_namespaces'].items():
+            print(f"- {namespace} ({count} vectors)")
+
+    ok = not report['extra_namespaces'] and all(
+        not (r['missing'] or r['extra'] or r['stale']) for r in results
+    )
+    print("\nIndex matches the source disease tree." if ok else "\nIndex differs from the source disease tree.")
+    return ok
+
+if __name__ == "__main__":
+    from pinecone import Pinecone
+    from config import PINECONE_API_KEY, PINECONE_INDEX_NAME
+
+    pc = Pinecone(api_key=PINECONE_API_KEY)
+    index = pc.Index(EMBEDDING.index_name or PINECONE_INDEX_NAME)
+    print_report(verify_index(index))